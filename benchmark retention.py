@@ -0,0 +1,70 @@
+import json
+import tempfile
+from datetime import datetime, timedelta
+from time import perf_counter
+from local_firebase import LocalFirebase
+from ureply_retention import DEFAULT_RETENTION_POLICY, RECORD_KEY_FORMAT, compact_rest
+import requests
+
+# Compare database root reads before and after compaction on a synthetic history
+RECORD_COUNT = 5000
+READ_REPEAT = 20
+
+
+def make_history(record_count):
+    # One record every 10 minutes, like a busy semester of lectures
+    start_time = datetime(2024, 1, 8, 8, 30, 0)
+    data = {}
+    for i in range(record_count):
+        current_time = (start_time + timedelta(minutes=10 * i)).strftime(RECORD_KEY_FORMAT)
+        data[current_time] = {
+            "Session ID": f"L{100000 + i}",
+            "Question Type": "mc" if i % 3 else "typing",
+            "Ureply Answer": chr(ord("a") + i % 5) if i % 3 else f"Typing answer number {i}",
+        }
+    data["Last Updated Time"] = {"Last Updated Time": current_time}
+    return data
+
+
+def measure_root_read(database_url, shallow=False):
+    params = {"shallow": "true"} if shallow else {}
+    requests.get(f"{database_url}/.json", params=params)  # warm up the connection
+
+    start = perf_counter()
+    for _ in range(READ_REPEAT):
+        response = requests.get(f"{database_url}/.json", params=params)
+    latency = (perf_counter() - start) / READ_REPEAT * 1000
+    return latency, len(response.content)
+
+
+def print_row(label, latency, size):
+    print(f"{label:<36}{latency:>10.2f} ms{size:>14,} bytes")
+
+
+def benchmark(mode):
+    print(f'\nMode: "{mode}" - {RECORD_COUNT} records')
+    with tempfile.TemporaryDirectory() as snapshot_folder, LocalFirebase(make_history(RECORD_COUNT)) as database:
+        policy = {**DEFAULT_RETENTION_POLICY, "Mode": mode, "Snapshot Folder": snapshot_folder}
+
+        print_row("Root read before compaction", *measure_root_read(database.url))
+        print_row("Shallow root read before compaction", *measure_root_read(database.url, shallow=True))
+
+        start = perf_counter()
+        moved_count = compact_rest(database.url, policy)
+        print(f"Compacted {moved_count} records in {perf_counter() - start:.2f} s")
+
+        print_row("Root read after compaction", *measure_root_read(database.url))
+        print_row("Shallow root read after compaction", *measure_root_read(database.url, shallow=True))
+
+        # The watcher only needs the latest record to still be reachable from the root
+        last_updated_time = database.get("Last Updated Time")["Last Updated Time"]
+        assert database.get(last_updated_time) is not None, "Latest record was moved"
+
+        if mode == "archive":
+            print(f'Note: "{policy["Archive Path"]}" is a child of the root, so archive mode only bounds the shallow key listing, not full root reads')
+
+
+if __name__ == "__main__":
+    print(json.dumps({"Record Count": RECORD_COUNT, "Read Repeat": READ_REPEAT}, indent=4))
+    benchmark("snapshot")
+    benchmark("archive")
@@ -0,0 +1 @@
+poetry run "compact ureply database.py"
\ No newline at end of file
@@ -0,0 +1,31 @@
+import json
+from os import system
+from ureply_retention import compact_rest, load_retention_policy
+
+with open("./info/info.json") as f:
+    info = json.load(f)
+    database_url = info["Database URL"]
+
+try:
+    policy = load_retention_policy(info)
+except Exception as e:
+    print(e)
+    system("pause")
+    exit()
+
+print(json.dumps(policy, indent=4))
+
+confirm = input(
+    f'Keep the latest {policy["Keep Latest Records"]} uReply records in the database root and move the rest ({policy["Mode"]})? ([y]/n): '
+)
+
+if confirm == "y" or confirm == "Y" or confirm == "":
+    try:
+        moved_count = compact_rest(database_url, policy)
+        print(f"Moved {moved_count} uReply records out of the database root.")
+    except Exception as e:
+        print(e)
+else:
+    print('Compaction cancelled. You can modify "Retention Policy" in the "info.json" file.')
+
+system("pause")
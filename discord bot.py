@@ -1,3 +1,4 @@
+import asyncio
 import discord
 from discord import ButtonStyle, app_commands
 from discord.ext import commands
@@ -5,6 +6,8 @@ from discord.ui import Button, View
 from firebase_admin import credentials, db, initialize_app
 import json
 from datetime import datetime
+from ureply_retention import compact_reference, load_retention_policy
+from ureply_trace import record_trace_event
 
 # Initialize Firebase Admin SDK
 cred = credentials.Certificate("./info for discord bot/service_account_key.json")
@@ -12,6 +15,8 @@ with open("./info for discord bot/discord_bot_info.json") as f:
     info = json.load(f)
     database_url = info["Database URL"]
     discord_bot_token = info["Discord Bot Token"]
+    retention_policy = load_retention_policy(info, snapshot_folder="./info for discord bot/snapshots")
+    trace_file = info.get("Trace File", "")  # record published answers for replay, disabled if empty
     initialize_app(cred, {"databaseURL": database_url})
 
 bot = commands.Bot(command_prefix="!", intents=discord.Intents.default())
@@ -23,22 +28,33 @@ last_updated_time_ref = ref.child("Last Updated Time")
 whether_publish_answer = True
 def publish_answer(current_time, session_id, question_type, ureply_answer):
     if whether_publish_answer:
-        ref.child(current_time).set(  # push new ureply info to the database with current time as key
-            {
-                "Session ID": session_id,
-                "Question Type": question_type,
-                "Ureply Answer": ureply_answer,
-            }
-        )
+        data = {
+            "Session ID": session_id,
+            "Question Type": question_type,
+            "Ureply Answer": ureply_answer,
+        }
+        ref.child(current_time).set(data)  # push new ureply info to the database with current time as key
 
         last_updated_time_ref.update(  # update last updated time to current time
             {"Last Updated Time": current_time}
         )
         print("Published uReply answer to the database")
+        try:
+            record_trace_event(trace_file, current_time, data)
+        except Exception as e:
+            print(f"Failed to record the trace: {e}")
     else:
         print("uReply answer not published to the database")
 
 
+def compact_database():
+    try:
+        moved_count = compact_reference(ref, retention_policy)
+        print(f"Moved {moved_count} old uReply records out of the database root")
+    except Exception as e:
+        print(f"Failed to compact the database: {e}")
+
+
 @bot.event
 async def on_ready():
     print(f'Logged in as "{bot.user}" ({bot.user.id})')
@@ -116,6 +132,9 @@ async def ureply(
         
     if whether_publish_answer is False:
         await interaction.followup.send("⚠️uReply answer not published to the database")
+    elif retention_policy["Compact After Publish"]:
+        # Compact after responding and off the event loop, as it may take a while on a large history
+        await asyncio.to_thread(compact_database)
         
 @bot.tree.command(name="get_ureply", description="Get the latest uReply answer")
 async def get_ureply(interaction: discord.Interaction):
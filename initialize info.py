@@ -3,6 +3,7 @@ from os import system, makedirs, path
 from getpass import getpass
 from datetime import datetime
 from send2trash import send2trash
+from ureply_retention import DEFAULT_RETENTION_POLICY
 
 folder_path = "./info"
 # Remove the info folder if it exists to start fresh
@@ -23,6 +24,9 @@ database_url = getpass("Database URL: ")
 print(
     '\nFetching Time Interval is set to be 5 seconds by default.\n'
     'AFK Checking Time Interval is set to be 30 seconds by default.\n'
+    f'Only the latest {DEFAULT_RETENTION_POLICY["Keep Latest Records"]} uReply records are kept in the database root when compacting, '
+    f'older ones are saved to "{DEFAULT_RETENTION_POLICY["Snapshot Folder"]}" by default.\n'
+    'The "archive" mode keeps them in the database instead, which only keeps the root key listing small, not full root reads.\n'
     'You can change it in the "info.json" file if necessary.'
 )
 
@@ -32,6 +36,8 @@ with open("./info/info.json", "w") as f:
             "Database URL": database_url,
             "Fetching Time Interval": 5,
             "AFK Time Interval": 30,
+            "Trace File": "",
+            "Retention Policy": DEFAULT_RETENTION_POLICY,
         },
         f,
         indent=4,
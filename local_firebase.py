@@ -0,0 +1,163 @@
+import copy
+import json
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class LocalFirebase:
+    """In-memory stand-in for the Firebase Realtime Database REST API.
+
+    Supports the subset used by the scripts in this repo: GET (with "shallow" or
+    an orderBy="$key" range with "startAt" / "endAt"), PUT, PATCH (including
+    multi-path updates with null to delete) and DELETE on "<path>.json" URLs.
+    Meant for benchmarks only, not for real lectures.
+    """
+
+    def __init__(self, data=None, host="127.0.0.1", port=0):
+        self.data = data if data is not None else {}
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    # ---- tree operations ----
+
+    @staticmethod
+    def _split(path):
+        return [part for part in path.split("/") if part]
+
+    def get(self, path, shallow=False, start_at=None, end_at=None):
+        with self.lock:
+            node = self.data
+            for part in self._split(path):
+                if not isinstance(node, dict) or part not in node:
+                    return None
+                node = node[part]
+            if isinstance(node, dict) and (start_at is not None or end_at is not None):
+                # Plain string comparison is enough for the timestamp keys used here
+                node = {
+                    key: value
+                    for key, value in node.items()
+                    if (start_at is None or key >= start_at) and (end_at is None or key <= end_at)
+                }
+            if shallow and isinstance(node, dict):
+                return {key: True if isinstance(value, dict) else value for key, value in node.items()}
+            # Copy while holding the lock, as the reply is serialized while other threads write
+            return copy.deepcopy(node)
+
+    def _set(self, parts, value):
+        # Caller holds the lock
+        if not parts:
+            self.data = value if isinstance(value, dict) else {}
+            return
+        node = self.data
+        for part in parts[:-1]:
+            if not isinstance(node.get(part), dict):
+                node[part] = {}
+            node = node[part]
+        if value is None:
+            node.pop(parts[-1], None)
+        else:
+            node[parts[-1]] = value
+        self._prune(parts[:-1])
+
+    def _prune(self, parts):
+        # Firebase does not keep empty objects, so remove parents left empty by a delete
+        while parts:
+            node = self.data
+            for part in parts[:-1]:
+                node = node[part]
+            if node.get(parts[-1]) == {}:
+                node.pop(parts[-1])
+            parts = parts[:-1]
+
+    def put(self, path, value):
+        with self.lock:
+            self._set(self._split(path), value)
+
+    def patch(self, path, values):
+        with self.lock:
+            for key, value in values.items():
+                self._set(self._split(path) + self._split(key), value)
+
+    def delete(self, path):
+        self.put(path, None)
+
+    def _make_handler(self):
+        database = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _path(self):
+                url = urllib.parse.urlsplit(self.path)
+                path = urllib.parse.unquote(url.path)
+                if path.endswith(".json"):
+                    path = path[: -len(".json")]
+                return path, urllib.parse.parse_qs(url.query)
+
+            def _body(self):
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length) or b"null")
+
+            def _reply(self, value, status=200):
+                payload = json.dumps(value, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                path, query = self._path()
+                range_query = {}
+                if query.get("orderBy") == ['"$key"']:
+                    range_query = {
+                        "start_at": json.loads(query["startAt"][0]) if "startAt" in query else None,
+                        "end_at": json.loads(query["endAt"][0]) if "endAt" in query else None,
+                    }
+                self._reply(database.get(path, shallow=query.get("shallow") == ["true"], **range_query))
+
+            def do_PUT(self):
+                path, _ = self._path()
+                value = self._body()
+                database.put(path, value)
+                self._reply(value)
+
+            def do_PATCH(self):
+                path, _ = self._path()
+                values = self._body()
+                if not isinstance(values, dict):
+                    self._reply({"error": "Invalid data; couldn't parse JSON object."}, status=400)
+                    return
+                database.patch(path, values)
+                self._reply(values)
+
+            def do_DELETE(self):
+                path, _ = self._path()
+                database.delete(path)
+                self._reply(None)
+
+            def log_message(self, *args):
+                pass  # keep benchmark output readable
+
+        return Handler
@@ -3,10 +3,12 @@ import requests
 from datetime import datetime
 import urllib.parse
 from os import system
+from ureply_retention import compact_rest, load_retention_policy
 
 with open("./info/info.json") as f:
     info = json.load(f)
     database_url = info["Database URL"]
+    retention_policy = load_retention_policy(info)
 
 
 def validate_data(data):
@@ -56,6 +58,13 @@ def publish_ureply_info(data):
     else:
         print("Error writing last updated time:", response.text)
 
+    if retention_policy["Compact After Publish"]:
+        try:
+            moved_count = compact_rest(database_url, retention_policy)
+            print(f"Moved {moved_count} old uReply records out of the database root.")
+        except Exception as e:
+            print("Error compacting the database:", e)
+
 
 def save_to_file(data):
     # Save the info to the local file
@@ -0,0 +1,236 @@
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from os import makedirs, path
+from statistics import median
+from time import sleep, time
+from local_firebase import LocalFirebase
+from ureply_retention import RECORD_KEY_FORMAT
+from ureply_trace import load_trace
+
+# Replay a recorded trace into a local database while the watcher runs against it,
+# then compare what was published with what the watcher observed
+WATCHER_SCRIPT = path.join(path.dirname(path.abspath(__file__)), "ureply auto take attendance.py")
+
+try:
+    import psutil
+except ImportError:  # dev dependency, without it CPU and RSS fall back to "resource", which is not available on Windows
+    psutil = None
+
+
+def prepare_watcher_folder(folder, database_url, fetching_time_interval):
+    makedirs(path.join(folder, "info"), exist_ok=True)
+
+    with open(path.join(folder, "info", "info.json"), "w") as f:
+        json.dump(
+            {
+                "Database URL": database_url,
+                "Fetching Time Interval": fetching_time_interval,
+                "AFK Time Interval": 30,
+                "Trace File": "./info/observed_trace.jsonl",
+                "Dry Run": True,
+            },
+            f,
+            indent=4,
+        )
+    with open(path.join(folder, "info", "credential.json"), "w") as f:
+        json.dump({"Login ID": "", "OnePass Password": ""}, f, indent=4)
+    with open(path.join(folder, "info", "ureply_retrieve.json"), "w") as f:
+        json.dump({"Session ID": "", "Ureply Answer": "", "Question Type": ""}, f, indent=4)
+
+    return path.join(folder, "info", "observed_trace.jsonl")
+
+
+def wait_for_watcher(watcher, folder, timeout):
+    # The watcher writes its last retrieved time right before polling, replayed keys must be later than it
+    last_retrieved_time_file = path.join(folder, "info", "last_retrieved_time.json")
+    deadline = time() + timeout
+    while time() < deadline:
+        if watcher.poll() is not None:
+            raise Exception(f"The watcher exited with code {watcher.returncode} before the replay started")
+        try:
+            with open(last_retrieved_time_file) as f:
+                json.load(f)["Last Retrieved Time"]
+            return
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            sleep(0.1)
+    raise Exception(f"The watcher did not start within {timeout} seconds")
+
+
+class ResourceMonitor:
+    # Sample the watcher process for CPU time and peak RSS while the replay runs
+    def __init__(self, process):
+        self.process = process
+        self.cpu_seconds = None
+        self.peak_rss = None
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if psutil is not None:
+            self.thread = threading.Thread(target=self._sample, daemon=True)
+            self.thread.start()
+        return self
+
+    def _sample(self):
+        watcher = psutil.Process(self.process.pid)
+        self.peak_rss = 0
+        while not self.stopped.is_set():
+            try:
+                cpu_times = watcher.cpu_times()
+                self.cpu_seconds = cpu_times.user + cpu_times.system
+                self.peak_rss = max(self.peak_rss, watcher.memory_info().rss)
+            except psutil.Error:
+                break
+            sleep(0.2)
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            return
+
+        try:
+            import resource
+        except ImportError:
+            return
+        # The watcher is the only child process, so the children usage is the watcher usage
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        self.cpu_seconds = usage.ru_utime + usage.ru_stime
+        self.peak_rss = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+def get_publish_time(event):
+    # The key is the publish time, while "Time" of a watcher trace is when the watcher polled
+    try:
+        return datetime.strptime(event["Key"], RECORD_KEY_FORMAT).timestamp()
+    except ValueError:
+        return event["Time"]
+
+
+def replay(events, database, speed):
+    # Publish the events in the same way as the publish script, keeping the original gaps
+    published = {}  # database key -> publish time
+    overwritten_keys = []
+    events = sorted(events, key=get_publish_time)
+    first_publish_time = get_publish_time(events[0])
+    # Keys keep the original, unscaled gaps, so speeding up never merges two keys.
+    # The watcher only compares key strings, so keys ahead of the clock are fine.
+    base_time = datetime.now().replace(microsecond=0) + timedelta(seconds=1)
+    start_time = time()
+
+    for event in events:
+        offset = get_publish_time(event) - first_publish_time
+        delay = start_time + offset / speed - time()
+        if delay > 0:
+            sleep(delay)
+
+        current_time = (base_time + timedelta(seconds=offset)).strftime(RECORD_KEY_FORMAT)
+        if current_time in published:
+            # Published within the same second in the trace, so the real publisher overwrote it too
+            overwritten_keys.append(current_time)
+        else:
+            published[current_time] = time()
+        database.patch("/", {current_time: event["Record"]})
+        database.patch("/Last Updated Time", {"Last Updated Time": current_time})
+
+    return published, overwritten_keys
+
+
+def format_seconds(seconds):
+    return "n/a" if seconds is None else f"{seconds:.2f} s"
+
+
+def report(published, overwritten_keys, observed_events, monitor):
+    observed = {}
+    for event in observed_events:
+        observed.setdefault(event["Key"], event["Time"])
+
+    latencies = [observed[key] - published[key] for key in published if key in observed]
+    missed = [key for key in published if key not in observed]
+
+    # Every replayed event is either detected, missed or overwritten by a later one
+    print(f"\nReplayed events:        {len(published) + len(overwritten_keys)}")
+    print(f"Detected questions:     {len(latencies)}")
+    print(f"Missed questions:       {len(missed)}")
+    for key in missed:
+        print(f"  - {key}")
+    print(f"Overwritten in trace:   {len(overwritten_keys)}")
+    for key in overwritten_keys:
+        print(f"  - {key}")
+
+    if latencies:
+        latencies.sort()
+        print(f"Detection latency min:  {format_seconds(latencies[0])}")
+        print(f"Detection latency p50:  {format_seconds(median(latencies))}")
+        print(f"Detection latency p95:  {format_seconds(latencies[int(0.95 * (len(latencies) - 1))])}")
+        print(f"Detection latency max:  {format_seconds(latencies[-1])}")
+
+    print(f"Watcher CPU time:       {format_seconds(monitor.cpu_seconds)}")
+    print(
+        "Watcher peak RSS:       "
+        + ("n/a" if monitor.peak_rss is None else f"{monitor.peak_rss / 1024 / 1024:.1f} MB")
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded uReply trace against the watcher")
+    parser.add_argument(
+        "trace_file",
+        help='trace recorded with the "Trace File" option. Only traces from the discord bot contain '
+        "every question of a burst, as the watcher only sees the latest question on each poll",
+    )
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed, e.g. 10 for 10x faster")
+    parser.add_argument("--fetching-time-interval", type=int, default=5, help="fetching time interval of the watcher")
+    parser.add_argument("--startup-timeout", type=float, default=60.0, help="seconds to wait at most for the watcher to start")
+    args = parser.parse_args()
+
+    events = load_trace(args.trace_file)
+    if not events:
+        print(f'No events in "{args.trace_file}"')
+        return
+
+    publish_times = [get_publish_time(event) for event in events]
+    duration = (max(publish_times) - min(publish_times)) / args.speed
+    print(f"Replaying {len(events)} events over {duration:.1f} seconds at {args.speed}x speed")
+
+    # Start with an old last updated time so that every replayed question is new to the watcher
+    initial_data = {"Last Updated Time": {"Last Updated Time": "2000-01-01 00:00:00"}}
+    with tempfile.TemporaryDirectory() as folder, LocalFirebase(initial_data) as database:
+        observed_trace_file = prepare_watcher_folder(folder, database.url, args.fetching_time_interval)
+
+        watcher = subprocess.Popen(
+            [sys.executable, WATCHER_SCRIPT],
+            cwd=folder,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            text=True,
+        )
+        watcher.stdin.write("n\n")  # do not take attendance for questions published before the replay
+        watcher.stdin.flush()
+        monitor = ResourceMonitor(watcher).start()
+
+        try:
+            wait_for_watcher(watcher, folder, args.startup_timeout)
+            published, overwritten_keys = replay(events, database, args.speed)
+            sleep(args.fetching_time_interval * 2)  # let the watcher pick up the last question
+            if watcher.poll() is not None:
+                print(f"[!] The watcher exited with code {watcher.returncode} during the replay")
+        except Exception as e:
+            print(e)
+            return
+        finally:
+            monitor.stopped.set()
+            watcher.terminate()
+            watcher.wait()
+            monitor.stop()
+
+        report(published, overwritten_keys, load_trace(observed_trace_file), monitor)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,13 +9,14 @@ from selenium.common.exceptions import (
     TimeoutException,
     WebDriverException,
 )
-from time import sleep
+from time import sleep, time
 from datetime import datetime
 from plyer import notification
 import json
 import requests
 import urllib.parse
 from random import randint
+from ureply_trace import record_trace_event
 
 received_new_answer_event = threading.Event()
 afk_checking_thread = None
@@ -39,6 +40,8 @@ with open("./info/info.json") as f:
     database_url = info["Database URL"]
     afk_time_interval = info["AFK Time Interval"]
     fetching_time_interval = info["Fetching Time Interval"]
+    trace_file = info.get("Trace File", "")  # record observed database changes for replay, disabled if empty
+    dry_run = info.get("Dry Run", False)  # only detect new uReplies without opening the browser, used by replay
 
 
 def print_divider():
@@ -264,6 +267,7 @@ while True:
 
             # Handle new ureplies
             if last_updated_time > last_retrieved_time:
+                observed_time = time()
                 try:
                     received_new_answer_event.set()  # Set the internal flag to True to stop AFK checking immediately
                     if afk_checking_thread is not None:
@@ -293,13 +297,21 @@ while True:
                         print_message(  # for logging
                             f"Received a new {question_type} uReply - {session_id}"
                         )
+                        try:
+                            record_trace_event(
+                                trace_file, last_updated_time, data, event_time=observed_time
+                            )
+                        except Exception as e:  # recording must not stop the uReply from being answered
+                            print_message(f"[!] Failed to record the trace: {e}")
 
                     else:
                         raise Exception(
                             f"An error occurred while fetching ureply info: {response.text}"
                         )
 
-                    if session_id.startswith(
+                    if dry_run:
+                        print_message("Dry run. Skipping...")
+                    elif session_id.startswith(
                         "L"
                     ):  # only perform actions if the session requires login (i.e. attendance taking)
                         if question_type == "typing":
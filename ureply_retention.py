@@ -0,0 +1,170 @@
+import gzip
+import json
+import urllib.parse
+from datetime import datetime
+from os import makedirs, path
+
+import requests
+
+# Records are stored at the database root with the publish time as key
+RECORD_KEY_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+DEFAULT_RETENTION_POLICY = {
+    # "snapshot" saves old records to local gzip files, so the root only holds the latest records.
+    # "archive" moves them under "Archive Path", which is still a child of the root: it only keeps
+    # the shallow key listing small, a full root read still downloads the whole archive.
+    "Mode": "snapshot",
+    "Keep Latest Records": 20,
+    "Archive Path": "Archive",
+    "Snapshot Folder": "./snapshots",  # outside "./info", which is wiped by "initialize info.py"
+    "Compact After Publish": False,
+}
+
+
+def load_retention_policy(info, snapshot_folder=DEFAULT_RETENTION_POLICY["Snapshot Folder"]):
+    # Fill in missing options so that older info files keep working
+    policy = {**DEFAULT_RETENTION_POLICY, "Snapshot Folder": snapshot_folder}
+    policy.update(info.get("Retention Policy", {}))
+
+    if policy["Mode"] not in ["archive", "snapshot"]:
+        raise Exception(f'[!] Invalid retention mode "{policy["Mode"]}"')
+    if int(policy["Keep Latest Records"]) < 1:
+        # The latest record must stay at the root for the watcher and "/get_ureply"
+        raise Exception("[!] \"Keep Latest Records\" must be at least 1")
+
+    return policy
+
+
+def is_record_key(key):
+    try:
+        datetime.strptime(key, RECORD_KEY_FORMAT)
+        return True
+    except ValueError:
+        return False
+
+
+def plan_compaction(root_keys, keep_latest, last_updated_time=None):
+    # Timestamp keys sort chronologically, so everything except the newest ones is moved.
+    # The record "Last Updated Time" points to is never moved, even if a publisher with a
+    # slow clock gave it an older key, as the watcher and "/get_ureply" read it from the root.
+    record_keys = sorted(key for key in root_keys if is_record_key(key) and key != last_updated_time)
+    return record_keys[: max(0, len(record_keys) - keep_latest)]
+
+
+def save_snapshot(records, snapshot_folder):
+    makedirs(snapshot_folder, exist_ok=True)
+    # ":" is not allowed in Windows file names
+    file_name = f"snapshot {datetime.now().strftime('%Y-%m-%d %H%M%S')}.json.gz"
+    file_path = path.join(snapshot_folder, file_name)
+
+    # Merge with a snapshot written within the same second instead of overwriting it
+    if path.exists(file_path):
+        with gzip.open(file_path, "rt", encoding="utf-8") as f:
+            records = {**json.load(f), **records}
+
+    with gzip.open(file_path, "wt", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False)
+
+    return file_path
+
+
+def group_by_date(records):
+    # "2024-01-15 10:00:00" -> {"2024-01-15": {"2024-01-15 10:00:00": {...}}}
+    archive = {}
+    for key, record in records.items():
+        archive.setdefault(key.split(" ")[0], {})[key] = record
+    return archive
+
+
+def compact(list_root_keys, read_last_updated_time, read_records, write_archive, delete_root_keys, policy):
+    """Move all but the latest records out of the database root so that it does not grow forever.
+
+    The storage operations are passed in so that the same policy works for both
+    the REST API and the Firebase Admin SDK. The records to move are read with a
+    single key range query, as timestamp keys sort chronologically. Records are
+    stored in the archive or snapshot before being deleted from the root, so an
+    interrupted run never loses data. Returns the number of moved records.
+    """
+    keys_to_move = plan_compaction(
+        list_root_keys(), int(policy["Keep Latest Records"]), read_last_updated_time()
+    )
+    if not keys_to_move:
+        return 0
+
+    records = read_records(keys_to_move)
+
+    if policy["Mode"] == "archive":
+        for date, day_records in group_by_date(records).items():
+            write_archive(f'{policy["Archive Path"]}/{date}', day_records)
+    elif policy["Mode"] == "snapshot":
+        save_snapshot(records, policy["Snapshot Folder"])
+
+    delete_root_keys(keys_to_move)
+    return len(keys_to_move)
+
+
+def compact_rest(database_url, policy):
+    # Used by the scripts that talk to the database with plain REST requests
+    def check(response, action):
+        if response.status_code != 200:
+            raise Exception(f"An error occurred while {action}: {response.text}")
+        return response
+
+    def list_root_keys():
+        # "shallow" only returns the keys, so listing does not download the whole archive
+        response = check(
+            requests.get(f"{database_url}/.json", params={"shallow": "true"}),
+            "listing the database root",
+        )
+        return list((response.json() or {}).keys())
+
+    def read_last_updated_time():
+        response = check(
+            requests.get(f"{database_url}/Last Updated Time.json"),
+            "reading the last updated time",
+        )
+        return (response.json() or {}).get("Last Updated Time")
+
+    def read_records(keys):
+        response = check(
+            requests.get(
+                f"{database_url}/.json",
+                params={"orderBy": '"$key"', "startAt": json.dumps(keys[0]), "endAt": json.dumps(keys[-1])},
+            ),
+            "reading the records to move",
+        )
+        records = response.json() or {}
+        return {key: records[key] for key in keys if key in records}
+
+    def write_archive(archive_path, records):
+        check(
+            requests.patch(f"{database_url}/{urllib.parse.quote(archive_path)}.json", json=records),
+            f'writing archive "{archive_path}"',
+        )
+
+    def delete_root_keys(keys):
+        # A multi-path update with null values deletes all the keys at once
+        check(
+            requests.patch(f"{database_url}/.json", json={key: None for key in keys}),
+            "deleting archived records from the database root",
+        )
+
+    return compact(
+        list_root_keys, read_last_updated_time, read_records, write_archive, delete_root_keys, policy
+    )
+
+
+def compact_reference(ref, policy):
+    # Used by the discord bot, which talks to the database with the Firebase Admin SDK
+    def read_records(keys):
+        records = ref.order_by_key().start_at(keys[0]).end_at(keys[-1]).get() or {}
+        return {key: records[key] for key in keys if key in records}
+
+    return compact(
+        list_root_keys=lambda: list((ref.get(shallow=True) or {}).keys()),
+        read_last_updated_time=lambda: (ref.child("Last Updated Time").get() or {}).get("Last Updated Time"),
+        read_records=read_records,
+        write_archive=lambda archive_path, records: ref.child(archive_path).update(records),
+        delete_root_keys=lambda keys: ref.update({key: None for key in keys}),
+        policy=policy,
+    )
@@ -0,0 +1,46 @@
+import json
+from os import makedirs, path
+from time import time
+
+
+def record_trace_event(trace_file, key, record, event_time=None):
+    """Append one database change to a JSON lines trace file.
+
+    Each event is a single appended line, so a process killed mid-write can only
+    lose its last event, which "load_trace" skips. Compress finished traces
+    afterwards if needed, as compressing each line separately makes them larger.
+    """
+    if not trace_file:  # recording is disabled
+        return
+
+    folder = path.dirname(trace_file)
+    if folder:
+        makedirs(folder, exist_ok=True)
+
+    event = {
+        "Time": time() if event_time is None else event_time,
+        "Key": key,
+        "Record": record,
+    }
+    line = json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n"
+    with open(trace_file, "ab+") as f:
+        # Terminate a line cut off by a crash so that it does not swallow this event
+        if f.tell() > 0:
+            f.seek(-1, 2)
+            if f.read(1) != b"\n":
+                line = "\n" + line
+        f.write(line.encode("utf-8"))
+
+
+def load_trace(trace_file):
+    if not path.exists(trace_file):
+        return []
+
+    events = []
+    with open(trace_file, encoding="utf-8") as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # blank line or a line cut off by a crash
+    return sorted(events, key=lambda event: event["Time"])